@@ -1,7 +1,14 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import json
+import numpy as np
+import matplotlib
+import plotly.graph_objects as go
+import re
+import hashlib
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from python_calamine import CalamineWorkbook
 
 # -----------------------------------------------------------------------------
 # 1. PAGE CONFIGURATION & CUSTOM CSS
@@ -55,72 +62,270 @@ st.markdown("""
 # 2. DATA LOGIC & CALCULATIONS
 # -----------------------------------------------------------------------------
 
-def extract_answer_value(val):
+# Matches the "value" field of an answer cell, including CSV-escaped cells ({""value"":2,...})
+_VAL_RE = re.compile(r'"+value"+\s*:\s*(-?\d+)')
+
+
+_INT16_MAX = np.iinfo(np.int16).max
+
+
+@lru_cache(maxsize=1024)
+def parse_answer_value(cell):
+    # Values that don't fit the int16 answer matrix can't match any key entry, so count as no answer
+    m = _VAL_RE.search(cell)
+    value = int(m.group(1)) if m else -1
+    return value if -1 <= value <= _INT16_MAX else -1
+
+
+def extract_answer_values(df, q_cols):
+    # Parse every question cell in one pass -> (students x questions) int16 matrix, -1 = no answer
+    if not q_cols:
+        return np.full((len(df), 0), -1, dtype=np.int16)
+
+    # Cells repeat a handful of distinct answer strings, so parse each distinct string once and
+    # gather by code; blank cells get code -1, which picks up the trailing -1
+    codes, uniques = pd.factorize(pd.concat([df[q_col] for q_col in q_cols], ignore_index=True))
+    parsed = np.array([parse_answer_value(cell) for cell in uniques] + [-1], dtype=np.int16)
+    return parsed[codes].reshape(len(q_cols), len(df)).T
+
+
+def score_matrix(answers, correct):
+    # Integer-only scoring kernel over (students x questions) int16 arrays where -1 means missing
+    has_key = correct >= 0
+    return (answers == correct) & has_key, has_key
+
+
+def build_key_table(key_df, assessment_type):
+    # (grade x question) array of correct values, -1 where the key has no entry
+    # Rows whose grade label isn't "G<n>" or whose question/value isn't numeric can never match a
+    # student, so they are skipped rather than failing the upload
+    key = pd.DataFrame({
+        'Grade': pd.to_numeric(key_df['Grade'].astype(str).str.extract(r'^G(\d+)$', expand=False), errors='coerce'),
+        'Question #': pd.to_numeric(key_df['Question #'], errors='coerce'),
+        'Correct Value': pd.to_numeric(key_df['Correct Value'], errors='coerce'),
+    })[key_df['Assessment'] == assessment_type].dropna()
+    key = key[key['Question #'].between(1, 10) & key['Correct Value'].between(0, _INT16_MAX)]
+    key = key.drop_duplicates(['Grade', 'Question #'])
+
+    grades = key['Grade'].to_numpy(dtype=int)
+    table = np.full((grades.max(initial=0) + 1, 11), -1, dtype=np.int16)
+    table[grades, key['Question #'].to_numpy(dtype=int)] = key['Correct Value'].to_numpy(dtype=np.int16)
+    return table
+
+
+def score_assessment(df, key_table):
+    q_cols = [f"Q{q_num}" for q_num in range(1, 11) if f"Q{q_num}" in df.columns]
+    q_nums = np.array([int(q_col[1:]) for q_col in q_cols], dtype=int)
+
+    # Gather each student's row of the key table; students with no/unknown grade get no key
+    grades = df['Grade'].fillna(-1).to_numpy(dtype=int)
+    known = (grades >= 0) & (grades < len(key_table))
+    correct = np.full((len(df), len(q_cols)), -1, dtype=np.int16)
+    correct[known] = key_table[grades[known][:, None], q_nums]
+
+    is_correct, has_key = score_matrix(extract_answer_values(df, q_cols), correct)
+
+    # Per-question correctness (NaN where the grade has no key entry), kept for question analysis
+    correct_df = pd.DataFrame(np.where(has_key, is_correct, np.nan).astype(np.float32), index=df.index,
+                              columns=[f"Correct_{q_col}" for q_col in q_cols])
+
+    # At most 10 questions, so scores fit in int8
+    return is_correct.sum(axis=1).astype(np.int8), has_key.sum(axis=1).astype(np.int8), correct_df
+
+
+def percentage(score, max_score):
+    # Students whose grade has no answer key get max_score 0, i.e. a NaN percentage
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (score / max_score * 100).astype(np.float32)
+
+
+REQUIRED_SHEETS = ['WB-Baseline-English', 'WB-Endline-English', 'AnswerKey']
+STUDENT_COLUMNS = ['Student ID', 'State', 'Center', 'Grade'] + [f"Q{q_num}" for q_num in range(1, 11)]
+STUDENT_DTYPES = {'Student ID': 'string[pyarrow]', 'State': 'category', 'Center': 'category', 'Grade': 'Int8',
+                  **{f"Q{q_num}": 'string[pyarrow]' for q_num in range(1, 11)}}
+KEY_COLUMNS = ['Grade', 'Assessment', 'Question #', 'Correct Value']
+
+# Parquet copies of processed workbooks, so a cold Streamlit cache doesn't re-parse the Excel file
+CACHE_DIR = Path(__file__).resolve().parent / ".workbook_cache"
+CACHE_VERSION = 9
+CACHED_FRAMES = ['merged', 'baseline', 'endline', 'answer_key']
+CACHE_MAX_WORKBOOKS = 20
+
+
+def workbook_digest(uploaded_file):
+    return hashlib.md5(uploaded_file.getvalue()).hexdigest()
+
+
+def _cache_paths(digest):
+    return [CACHE_DIR / f"{digest}-v{CACHE_VERSION}-{name}.parquet" for name in CACHED_FRAMES]
+
+
+def load_cached_frames(digest):
+    paths = _cache_paths(digest)
+    if not all(path.exists() for path in paths):
+        return None
     try:
-        if pd.isna(val): return None
-        clean_val = str(val).strip()
-        if clean_val.startswith('"') and clean_val.endswith('"'):
-            clean_val = clean_val[1:-1].replace('""', '"')
-        data = json.loads(clean_val)
-        return int(data.get('value', -1))
-    except:
+        frames = tuple(pd.read_parquet(path) for path in paths)
+    except Exception:
         return None
+    try:
+        for path in paths:
+            path.touch()  # mark as recently used for _prune_cache
+    except OSError:
+        pass
+    return frames
 
 
-def calculate_row_score(row, key_df, assessment_type):
-    score = 0
-    total_questions = 0
-    grade = row['Grade']
-    relevant_key = key_df[(key_df['Grade'] == f"G{grade}") & (key_df['Assessment'] == assessment_type)]
+def save_cached_frames(digest, frames):
+    # Best effort: an unwritable cache dir or an unserialisable column just means no sidecar
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        for df, path in zip(frames, _cache_paths(digest)):
+            df.to_parquet(path, compression='zstd', index=False)
+    except Exception:
+        for path in _cache_paths(digest):
+            path.unlink(missing_ok=True)
+    _prune_cache()
+
 
-    for q_num in range(1, 11):
-        q_col = f"Q{q_num}"
-        if q_col in row:
-            student_ans = extract_answer_value(row[q_col])
-            correct_row = relevant_key[relevant_key['Question #'] == q_num]
-            if not correct_row.empty:
-                correct_ans = correct_row.iloc[0]['Correct Value']
-                if student_ans == correct_ans:
-                    score += 1
-                total_questions += 1
-    return score, total_questions
+def _prune_cache():
+    # Drop sidecars from older CACHE_VERSIONs and keep only the most recently used workbooks
+    try:
+        current = {}
+        for path in CACHE_DIR.glob("*.parquet"):
+            digest, _, rest = path.name.partition('-')
+            if not rest.startswith(f"v{CACHE_VERSION}-"):
+                path.unlink(missing_ok=True)
+            else:
+                current.setdefault(digest, []).append(path)
+
+        by_recency = sorted(current.values(), key=lambda paths: max(p.stat().st_mtime for p in paths), reverse=True)
+        for paths in by_recency[CACHE_MAX_WORKBOOKS:]:
+            for path in paths:
+                path.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def growth_styles(growth):
+    # Cell CSS for the deep-dive Growth column: RdYlGn over the cohort's growth range, with light text on
+    # dark cells, matching Styler.background_gradient but computed once at ingest instead of per rerun
+    low, high = growth.min(), growth.max()
+    norm = ((growth - low) / (high - low if high > low else 1)).to_numpy(dtype=float, na_value=np.nan)
+    rgb = matplotlib.colormaps['RdYlGn'](norm)[:, :3]
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    dark = linear @ [0.2126, 0.7152, 0.0722] < 0.408
+
+    styles = [
+        f"background-color: #{r:02x}{g:02x}{b:02x}; color: {'#f1f1f1' if is_dark else '#000000'}"
+        for (r, g, b), is_dark in zip((rgb * 255).round().astype(int), dark)
+    ]
+    return pd.Series(styles, index=growth.index).where(growth.notna(), '')
+
+
+# Excel stores every number as a float; like pandas' calamine reader, whole numbers become ints per cell
+_whole_floats_to_int = np.frompyfunc(lambda v: int(v) if isinstance(v, float) and v.is_integer() else v, 1, 1)
+
+
+def read_sheet(workbook, sheet_name, columns, dtypes=None):
+    # Stream the sheet's cell values once and build a frame from the wanted columns only
+    rows = workbook.get_sheet_by_name(sheet_name).to_python()
+    header, body = (rows[0], rows[1:]) if rows else ([], [])
+    keep = [i for i, name in enumerate(header) if name in columns]
+    cells = _whole_floats_to_int(np.array(body, dtype=object).reshape(len(body), len(header))[:, keep])
+    df = pd.DataFrame(cells, columns=[header[i] for i in keep]).replace('', np.nan).infer_objects()
+    df = df.dropna(how='all').reset_index(drop=True)
+
+    # Whole-number columns with blanks are inferred as float; keep them integer (IDs, grades)
+    for col in df.select_dtypes('float').columns:
+        if (df[col].dropna() % 1 == 0).all():
+            df[col] = df[col].astype('Int64')
+    return df.astype({col: dtype for col, dtype in (dtypes or {}).items() if col in df.columns})
 
 
 @st.cache_data
 def process_workbook(uploaded_file):
     try:
-        xls = pd.read_excel(uploaded_file, sheet_name=None)
-        if not all(x in xls for x in ['WB-Baseline-English', 'WB-Endline-English', 'AnswerKey']):
+        digest = workbook_digest(uploaded_file)
+        cached = load_cached_frames(digest)
+        if cached is not None:
+            return (*cached, digest)
+
+        uploaded_file.seek(0)
+        workbook = CalamineWorkbook.from_filelike(uploaded_file)
+        if not all(x in workbook.sheet_names for x in REQUIRED_SHEETS):
             st.error("Missing required sheets.")
-            return None, None, None, None
+            return None, None, None, None, None
 
-        baseline_df = xls['WB-Baseline-English']
-        endline_df = xls['WB-Endline-English']
-        answer_key = xls['AnswerKey']
+        # Only read the columns used below; Q columns missing from a sheet are simply not scored
+        baseline_df = read_sheet(workbook, 'WB-Baseline-English', STUDENT_COLUMNS, STUDENT_DTYPES)
+        endline_df = read_sheet(workbook, 'WB-Endline-English', STUDENT_COLUMNS, STUDENT_DTYPES)
+        answer_key = read_sheet(workbook, 'AnswerKey', KEY_COLUMNS)
 
-        # Calculate Scores
-        baseline_df['Score'], baseline_df['Max_Score'] = zip(*baseline_df.apply(
-            lambda x: calculate_row_score(x, answer_key, 'Baseline'), axis=1
-        ))
-        baseline_df['Percentage'] = (baseline_df['Score'] / baseline_df['Max_Score']) * 100
+        # Calculate Scores (the two assessments are independent, so score them concurrently)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            baseline_scores = pool.submit(score_assessment, baseline_df, build_key_table(answer_key, 'Baseline'))
+            endline_scores = pool.submit(score_assessment, endline_df, build_key_table(answer_key, 'Endline'))
 
-        endline_df['Score'], endline_df['Max_Score'] = zip(*endline_df.apply(
-            lambda x: calculate_row_score(x, answer_key, 'Endline'), axis=1
-        ))
-        endline_df['Percentage'] = (endline_df['Score'] / endline_df['Max_Score']) * 100
+        bl_score, bl_max, _ = baseline_scores.result()
+        baseline_df = baseline_df.assign(Score=bl_score, Max_Score=bl_max, Percentage=percentage(bl_score, bl_max))
+
+        el_score, el_max, endline_correct = endline_scores.result()
+        endline_df = endline_df.assign(Score=el_score, Max_Score=el_max, Percentage=percentage(el_score, el_max),
+                                       **endline_correct)
 
         # Merge
-        merged_df = pd.merge(
-            baseline_df[['Student ID', 'State', 'Center', 'Grade', 'Percentage', 'Score']],
-            endline_df[['Student ID', 'Percentage', 'Score']],
-            on='Student ID', suffixes=('_BL', '_EL')
-        )
+        merged_df = baseline_df.set_index('Student ID')[['State', 'Center', 'Grade', 'Percentage', 'Score']].join(
+            endline_df.set_index('Student ID')[['Percentage', 'Score']],
+            how='inner', lsuffix='_BL', rsuffix='_EL', sort=False
+        ).reset_index()
         merged_df['Growth'] = merged_df['Percentage_EL'] - merged_df['Percentage_BL']
 
-        return merged_df, baseline_df, endline_df, answer_key
+        merged_df['Growth_Style'] = growth_styles(merged_df['Growth'])
+
+        # Lower-cased "<ID>\x01<Centre>" text, so the deep-dive search is one literal substring scan
+        merged_df['Search_Key'] = (
+            merged_df['Student ID'].fillna('') + '\x01' + merged_df['Center'].astype('string[pyarrow]').fillna('')
+        ).str.lower()
+
+        save_cached_frames(digest, (merged_df, baseline_df, endline_df, answer_key))
+        return merged_df, baseline_df, endline_df, answer_key, digest
     except Exception as e:
         st.error(f"Error: {e}")
-        return None, None, None, None
+        return None, None, None, None, None
+
+
+def filter_cohort(df, states, grades):
+    # State/Grade are categorical/Int8 from ingest, so isin works on codes rather than Python objects
+    return df[df['State'].isin(states) & df['Grade'].isin(grades)]
+
+
+# Per-cohort aggregations. The filtered frame is passed as `_cohort_df` so Streamlit doesn't hash it;
+# the cache is keyed on (workbook digest, selected states, selected grades) instead.
+@st.cache_data
+def grade_summary(_cohort_df, digest, states, grades):
+    return _cohort_df.groupby('Grade', observed=True)[['Percentage_BL', 'Percentage_EL']].mean()
+
+
+@st.cache_data
+def center_summary(_cohort_df, digest, states, grades):
+    return _cohort_df.groupby('Center', observed=True).agg(
+        Avg_Growth=('Growth', 'mean'),
+        Avg_Endline=('Percentage_EL', 'mean'),
+        Count=('Student ID', 'count')
+    ).reset_index()
+
+
+@st.cache_data
+def question_accuracy(_cohort_df, digest, states, grades):
+    # Grade x question accuracy matrix from the correctness columns computed at ingest; grades and
+    # questions without any answer key entries are dropped
+    correct_cols = [c for c in _cohort_df.columns if c.startswith('Correct_Q')]
+    return (
+        _cohort_df.groupby('Grade', observed=True)[correct_cols].mean().mul(100)
+        .rename(columns=lambda c: c.removeprefix('Correct_'))
+        .dropna(how='all').dropna(axis=1, how='all')
+    )
 
 
 # -----------------------------------------------------------------------------
@@ -130,7 +335,7 @@ st.sidebar.title("📂 Data Setup")
 uploaded_file = st.sidebar.file_uploader("Upload Workbook", type=["xlsx"])
 
 if uploaded_file:
-    df_merged, df_bl, df_el, answer_key = process_workbook(uploaded_file)
+    df_merged, df_bl, df_el, answer_key, digest = process_workbook(uploaded_file)
 
     if df_merged is not None:
         # Sidebar Filters
@@ -138,13 +343,14 @@ if uploaded_file:
         st.sidebar.header("🔍 Filters")
         selected_state = st.sidebar.multiselect("State", df_merged['State'].unique(),
                                                 default=df_merged['State'].unique())
-        selected_grade = st.sidebar.multiselect("Grade", sorted(df_merged['Grade'].unique()),
-                                                default=sorted(df_merged['Grade'].unique()))
+        selected_grade = st.sidebar.multiselect("Grade", sorted(df_merged['Grade'].dropna().unique()),
+                                                default=sorted(df_merged['Grade'].dropna().unique()))
 
         # Apply Filters
-        filtered_df = df_merged[(df_merged['State'].isin(selected_state)) & (df_merged['Grade'].isin(selected_grade))]
-        filtered_bl = df_bl[(df_bl['State'].isin(selected_state)) & (df_bl['Grade'].isin(selected_grade))]
-        filtered_el = df_el[(df_el['State'].isin(selected_state)) & (df_el['Grade'].isin(selected_grade))]
+        filtered_df = filter_cohort(df_merged, selected_state, selected_grade)
+        filtered_el = filter_cohort(df_el, selected_state, selected_grade)
+        # Reuse the digest from process_workbook rather than re-hashing the upload on every rerun
+        cohort_key = (digest, tuple(selected_state), tuple(selected_grade))
 
         st.title("eVidyaloka Impact Dashboard 🚀")
 
@@ -188,13 +394,16 @@ if uploaded_file:
             st.divider()
 
             # Grade Comparison Chart
-            grade_stats = filtered_df.groupby('Grade')[['Percentage_BL', 'Percentage_EL']].mean().reset_index()
-            grade_melted = grade_stats.melt(id_vars='Grade', var_name='Type', value_name='Score')
-
-            fig = px.bar(grade_melted, x='Grade', y='Score', color='Type', barmode='group',
-                         title="Average Performance by Grade (Baseline vs Endline)",
-                         color_discrete_map={'Percentage_BL': '#bdc3c7', 'Percentage_EL': '#00796b'})
-            fig.update_layout(plot_bgcolor='white')
+            grade_stats = grade_summary(filtered_df, *cohort_key)
+            grades = grade_stats.index.to_numpy(dtype=int)
+
+            fig = go.Figure([
+                go.Bar(x=grades, y=grade_stats['Percentage_BL'], name='Baseline', marker_color='#bdc3c7'),
+                go.Bar(x=grades, y=grade_stats['Percentage_EL'], name='Endline', marker_color='#00796b')
+            ])
+            fig.update_layout(barmode='group', title="Average Performance by Grade (Baseline vs Endline)",
+                              xaxis_title='Grade', yaxis_title='Score', legend_title_text='Type',
+                              plot_bgcolor='white')
             st.plotly_chart(fig, use_container_width=True)
 
         # --- TAB 2: CENTRE PERFORMANCE ---
@@ -203,20 +412,21 @@ if uploaded_file:
             st.caption(
                 "This matrix helps identify high-performing centers (Top Right) vs. those needing attention (Bottom Left).")
 
-            center_stats = filtered_df.groupby('Center').agg(
-                Avg_Growth=('Growth', 'mean'),
-                Avg_Endline=('Percentage_EL', 'mean'),
-                Count=('Student ID', 'count')
-            ).reset_index()
-
-            # Full Width Scatter Plot
-            fig_scatter = px.scatter(
-                center_stats, x='Avg_Endline', y='Avg_Growth', size='Count', color='Avg_Growth',
-                hover_name='Center', title="Growth vs Proficiency Matrix",
-                labels={'Avg_Endline': 'Final Proficiency (%)', 'Avg_Growth': 'Growth (%)'},
-                color_continuous_scale='Teal',
-                height=600
-            )
+            center_stats = center_summary(filtered_df, *cohort_key)
+
+            # Full Width Scatter Plot (WebGL, so it stays responsive with many centres)
+            max_count = max(center_stats['Count'].max(), 1) if not center_stats.empty else 1
+            fig_scatter = go.Figure(go.Scattergl(
+                x=center_stats['Avg_Endline'], y=center_stats['Avg_Growth'], mode='markers',
+                hovertext=center_stats['Center'], customdata=center_stats['Count'],
+                hovertemplate="<b>%{hovertext}</b><br>Final Proficiency (%)=%{x}<br>Growth (%)=%{y}"
+                              "<br>Count=%{customdata}<extra></extra>",
+                marker=dict(size=center_stats['Count'], sizemode='area', sizeref=2 * max_count / 20 ** 2,
+                            color=center_stats['Avg_Growth'], colorscale='Teal', showscale=True,
+                            colorbar=dict(title='Growth (%)'))
+            ))
+            fig_scatter.update_layout(title="Growth vs Proficiency Matrix", xaxis_title='Final Proficiency (%)',
+                                      yaxis_title='Growth (%)', height=600)
             fig_scatter.add_hline(y=center_stats['Avg_Growth'].mean(), line_dash="dot", annotation_text="Avg Growth",
                                   annotation_position="bottom right")
             fig_scatter.add_vline(x=center_stats['Avg_Endline'].mean(), line_dash="dot", annotation_text="Avg Score",
@@ -229,17 +439,17 @@ if uploaded_file:
             st.markdown("### 🕵️ Student Level Deep Dive")
             search_term = st.text_input("Search by Student ID or Center Name:")
 
-            display_df = filtered_df.copy()
+            display_cols = ['Student ID', 'Grade', 'Center', 'Percentage_BL', 'Percentage_EL', 'Growth']
             if search_term:
-                display_df = display_df[
-                    display_df['Student ID'].astype(str).str.contains(search_term) |
-                    display_df['Center'].str.contains(search_term, case=False)
-                    ]
+                display_df = filtered_df.loc[
+                    filtered_df['Search_Key'].str.contains(search_term.lower(), regex=False), display_cols
+                ]
+            else:
+                display_df = filtered_df[display_cols]
 
             st.dataframe(
-                display_df[['Student ID', 'Grade', 'Center', 'Percentage_BL', 'Percentage_EL', 'Growth']]
-                .style.format("{:.1f}", subset=['Percentage_BL', 'Percentage_EL', 'Growth'])
-                .background_gradient(subset=['Growth'], cmap='RdYlGn'),
+                display_df.style.format("{:.1f}", subset=['Percentage_BL', 'Percentage_EL', 'Growth'], na_rep='')
+                .apply(lambda col: df_merged.loc[col.index, 'Growth_Style'], subset=['Growth']),
                 use_container_width=True
             )
 
@@ -248,42 +458,23 @@ if uploaded_file:
             st.markdown("### 🧪 Question Difficulty Analysis")
             st.info("Analyzing Endline Data to identify learning gaps.")
 
-
-            def calculate_question_stats(df, key_df, assessment_type):
-                stats = []
-                for grade in df['Grade'].unique():
-                    grade_df = df[df['Grade'] == grade]
-                    key_subset = key_df[(key_df['Grade'] == f"G{grade}") & (key_df['Assessment'] == assessment_type)]
-
-                    for q_num in range(1, 11):
-                        q_col = f"Q{q_num}"
-                        if q_col in grade_df.columns:
-                            q_key = key_subset[key_subset['Question #'] == q_num]
-                            if not q_key.empty:
-                                correct_val = q_key.iloc[0]['Correct Value']
-                                extracted = grade_df[q_col].apply(extract_answer_value)
-                                is_correct = (extracted == correct_val)
-                                accuracy = is_correct.mean() * 100
-                                stats.append({'Grade': grade, 'Question': f"Q{q_num}", 'Accuracy': accuracy})
-                return pd.DataFrame(stats)
-
-
-            q_stats = calculate_question_stats(filtered_el, answer_key, 'Endline')
+            q_stats = question_accuracy(filtered_el, *cohort_key)
 
             if not q_stats.empty:
                 col1, col2 = st.columns([2, 1])
 
                 with col1:
-                    fig_heat = px.density_heatmap(
-                        q_stats, x='Question', y='Grade', z='Accuracy',
-                        color_continuous_scale='RdYlGn', text_auto='.0f',
-                        title="Question Accuracy Heatmap (Red = Hard, Green = Easy)",
-                        range_color=[0, 100]
-                    )
+                    fig_heat = go.Figure(go.Heatmap(
+                        z=q_stats.to_numpy(), x=q_stats.columns, y=q_stats.index.to_numpy(dtype=int),
+                        colorscale='RdYlGn', zmin=0, zmax=100, texttemplate='%{z:.0f}',
+                        colorbar=dict(title='Accuracy')
+                    ))
+                    fig_heat.update_layout(title="Question Accuracy Heatmap (Red = Hard, Green = Easy)",
+                                           xaxis_title='Question', yaxis_title='Grade')
                     st.plotly_chart(fig_heat, use_container_width=True)
 
                 with col2:
-                    avg_by_q = q_stats.groupby('Question')['Accuracy'].mean().sort_values()
+                    avg_by_q = q_stats.mean().sort_values()
                     hardest = avg_by_q.idxmin()
                     easiest = avg_by_q.idxmax()
 